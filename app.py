@@ -8,88 +8,67 @@ import logging
 from datetime import datetime
 import time
 
-logging.basicConfig(
-    filename="backend.log",
-    filemode="a",
-    level=logging.DEBUG,
-    format="%(asctime)s %(levelname)s %(message)s"
-)
+from log_config import setup_logging, new_request_id, request_id
+
+setup_logging("backend.log")
 
 # Load environment variables
 load_dotenv()
 
 # Imports
-from prompts import build_prompt
-from llm_client import call_llm
-from validator import validate_schedule
+from llm_client import generate_schedule, provider_health
+from store import RosterStore
+from scheduling import (
+    RELAXATIONS, prepare_request, stage_prompt, accept_schedule, provider_error, all_failed
+)
 
 app = Flask(__name__)
+store = RosterStore(os.getenv("ROSTER_DB", "rosters.db"))
+
+@app.before_request
+def assign_request_id():
+    # Correlates every log line of a request; honours an incoming X-Request-ID
+    new_request_id(request.headers.get("X-Request-ID"))
+
+@app.after_request
+def return_request_id(response):
+    response.headers["X-Request-ID"] = request_id.get()
+    return response
+
+@app.route("/health", methods=["GET"])
+def health():
+    """Reports circuit breaker state for each configured LLM provider."""
+    report = provider_health()
+    healthy = any(p["state"] != "open" for p in report["providers"].values())
+    report["status"] = "ok" if healthy else "degraded"
+    return jsonify(report), 200 if healthy else 503
 
 @app.route("/schedule", methods=["POST"])
 def schedule():
     try:
         user_inputs = request.get_json()
-        if not user_inputs:
-            return jsonify({"error": "Invalid or missing JSON payload"}), 400
-        
-        try:
-            # parse whatever was sent (e.g. “2025-6-26”), then re-serialize correctly
-            sd = datetime.fromisoformat(user_inputs["start_date"]).date()
-            ed = datetime.fromisoformat(user_inputs["end_date"]).date()
-            user_inputs["start_date"] = sd.isoformat()
-            user_inputs["end_date"]   = ed.isoformat()
-        except Exception as e:
-            return jsonify({"error": f"Invalid date format: {e}"}), 400
-
-        # === Soft Constraint Relaxation Stages ===
-        relaxations = [
-            {"note": "Strict (no relaxation)", "append": ""},
-            {"note": "Ignore shift preferences", "append": "\nYou may ignore nurse shift preferences if needed."},
-            {"note": "Relax AM shift % if needed", "append": "\nYou may relax AM shift % if needed."},
-            {"note": "Relax weekly hour targets", "append": "\nYou may relax weekly target hours if needed."},
-            {"note": "Relax any 2 soft rules", "append": "\nYou may relax any 2 soft rules above."},
-            {"note": "Relax all soft rules", "append": "\nYou may relax all soft rules if necessary."},
-        ]
+        first_stage, reply = prepare_request(user_inputs, store)
+        if reply:
+            return jsonify(reply[0]), reply[1]
 
         last_error = None
 
-        for stage in relaxations:
-            # Build prompt with current relaxation
-            prompt = build_prompt(user_inputs) + stage["append"]
-            logging.info(f"\n=== Attempt: {stage['note']} ===")
+        for stage in RELAXATIONS[first_stage:]:
+            prompt = stage_prompt(user_inputs, stage)
 
             try:
                 start_time = time.time()
 
-                result = call_llm(prompt)
-                schedule = result.get("s") or result.get("schedule")
-                if not schedule:
-                    raise ValueError("Missing 'schedule' in LLM response")
-
-                # DEBUG
-                # logging.info("[LLM OUTPUT]")
-                # logging.info(json.dumps(schedule, indent=2))
-
-                # Try validating the schedule
-                validate_schedule(schedule, user_inputs)
-
-                elapsed = time.time()
-                logging.info(f"[TIMING] Solution found in {elapsed:.2f} seconds.")
+                schedule = generate_schedule(prompt, user_inputs)
 
-                # If valid, return result with relaxation info
-                return jsonify({
-                    "schedule": schedule,
-                    "relaxed_constraints": stage["note"],
-                    "solve_time_seconds": round(elapsed, 2)
-                }), 200
+                body, status = accept_schedule(schedule, stage, user_inputs, store, start_time)
+                return jsonify(body), status
 
             except RuntimeError as rte:
-                if "rate limit" in str(rte).lower():
-                    return jsonify({
-                        "error": str(rte)
-                    }), 429
-                else:
+                reply = provider_error(rte)
+                if reply is None:
                     raise
+                return jsonify(reply[0]), reply[1]
             except ValueError as ve:
                 last_error = str(ve)
                 logging.info(f"[VALIDATION ERROR] {last_error}")
@@ -100,15 +79,66 @@ def schedule():
                 return jsonify({"error": f"LLM failure: {str(e)}"}), 500
 
         # All attempts failed
-        return jsonify({
-            "error": f"All attempts failed. Last validation error: {last_error}",
-            "relaxed_constraints": "All soft constraints attempted"
-        }), 422
+        body, status = all_failed(last_error)
+        return jsonify(body), status
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
+def _date_range_args():
+    """Reads ?start=&end= (ISO dates, end defaults to start); raises ValueError."""
+    start = request.args.get("start")
+    if not start:
+        raise ValueError("Missing 'start' query parameter")
+    end = request.args.get("end", start)
+    sd = datetime.fromisoformat(start).date()
+    ed = datetime.fromisoformat(end).date()
+    if ed < sd:
+        raise ValueError("'end' is before 'start'")
+    return sd.isoformat(), ed.isoformat()
+
+@app.route("/rosters/nurses/<nurse>/calendar", methods=["GET"])
+def nurse_calendar(nurse):
+    try:
+        start, end = _date_range_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    ward = request.args.get("ward")
+    return jsonify({
+        "nurse": nurse,
+        "calendar": store.nurse_calendar(nurse, start, end, ward)
+    }), 200
+
+@app.route("/rosters/coverage/<date>", methods=["GET"])
+def day_coverage(date):
+    try:
+        date = datetime.fromisoformat(date).date().isoformat()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date format: {e}"}), 400
+    ward = request.args.get("ward")
+    shift = request.args.get("shift")
+    try:
+        coverage = store.day_coverage(date, ward, shift)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "date": date,
+        "coverage": coverage
+    }), 200
+
+@app.route("/rosters/nurses/<nurse>/hours", methods=["GET"])
+def nurse_weekly_hours(nurse):
+    try:
+        start, end = _date_range_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    ward = request.args.get("ward")
+    return jsonify({
+        "nurse": nurse,
+        "weeks": store.weekly_hours(nurse, start, end, ward)
+    }), 200
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=True)
@@ -0,0 +1,134 @@
+# asgi_app.py
+"""
+Async serving mode: the same /schedule contract as app.py, with non-blocking
+provider I/O. A ladder run is cancelled as soon as the client disconnects.
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+"""
+import os
+import asyncio
+import logging
+import time
+import traceback
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from log_config import setup_logging, new_request_id
+
+setup_logging("backend.log")
+
+# Load environment variables
+load_dotenv()
+
+# Imports
+import llm_client
+from llm_client import agenerate_schedule, provider_health
+from store import RosterStore
+from scheduling import (
+    RELAXATIONS, prepare_request, stage_prompt, accept_schedule, provider_error, all_failed
+)
+
+store = RosterStore(os.getenv("ROSTER_DB", "rosters.db"))
+
+# 499: client closed the request (nginx convention); nobody reads this response
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def run_schedule(user_inputs: dict):
+    """The relaxation ladder of app.schedule; returns (body, status)."""
+    try:
+        # SQLite reads/writes and validation run in worker threads, off the event loop
+        first_stage, reply = await asyncio.to_thread(prepare_request, user_inputs, store)
+        if reply:
+            return reply
+
+        last_error = None
+
+        for stage in RELAXATIONS[first_stage:]:
+            prompt = stage_prompt(user_inputs, stage)
+
+            try:
+                start_time = time.time()
+
+                schedule = await agenerate_schedule(prompt, user_inputs)
+
+                return await asyncio.to_thread(accept_schedule, schedule, stage, user_inputs, store, start_time)
+
+            except RuntimeError as rte:
+                reply = provider_error(rte)
+                if reply is None:
+                    raise
+                return reply
+            except ValueError as ve:
+                last_error = str(ve)
+                logging.info(f"[VALIDATION ERROR] {last_error}")
+                continue
+            except Exception as e:
+                logging.info(f"[LLM ERROR] {str(e)}")
+                traceback.print_exc()
+                return {"error": f"LLM failure: {str(e)}"}, 500
+
+        # All attempts failed
+        return all_failed(last_error)
+
+    except Exception as e:
+        traceback.print_exc()
+        return {"error": f"Internal server error: {str(e)}"}, 500
+
+
+async def _wait_for_disconnect(request: Request):
+    # The body has been read, so the next ASGI message is the disconnect
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def schedule(request: Request):
+    rid = new_request_id(request.headers.get("X-Request-ID"))
+    try:
+        user_inputs = await request.json()
+    except ValueError:
+        user_inputs = None
+
+    # Tasks copy the current context, so the request id follows the ladder run
+    ladder = asyncio.create_task(run_schedule(user_inputs))
+    disconnect = asyncio.create_task(_wait_for_disconnect(request))
+    done, _ = await asyncio.wait({ladder, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+
+    if ladder in done:
+        disconnect.cancel()
+        body, status = ladder.result()
+        return JSONResponse(body, status_code=status, headers={"X-Request-ID": rid})
+
+    ladder.cancel()
+    logging.info("[CANCELLED] Client disconnected; ladder run cancelled")
+    return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+
+async def health(request: Request):
+    """Reports circuit breaker state for each configured LLM provider."""
+    report = provider_health()
+    healthy = any(p["state"] != "open" for p in report["providers"].values())
+    report["status"] = "ok" if healthy else "degraded"
+    return JSONResponse(report, status_code=200 if healthy else 503)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await llm_client.aclose()
+
+
+app = Starlette(
+    routes=[
+        Route("/schedule", schedule, methods=["POST"]),
+        Route("/health", health, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,81 @@
+"""
+Compares json_extract.extract_schedule with the fallback chain previously
+copied into each llm_client provider branch.
+
+    python benchmarks/json_extract_bench.py
+"""
+import json
+import os
+import re
+import sys
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from json_extract import extract_schedule
+
+
+def legacy_extract(content: str) -> dict:
+    """The json.loads -> greedy regex -> fenced regex -> find/rfind chain."""
+    if content.strip().startswith("```"):
+        content = re.sub(r"^```(?:json)?\s*|```$", "", content.strip(), flags=re.MULTILINE).strip()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        match = re.search(r'\{[\s\S]*\}', content)
+        if match:
+            try:
+                return json.loads(match.group())
+            except json.JSONDecodeError:
+                pass
+        fenced = re.search(r"```json\s*([\s\S]*?)\s*```", content)
+        if fenced:
+            try:
+                return json.loads(fenced.group(1).strip())
+            except json.JSONDecodeError:
+                pass
+        first = content.find("{")
+        last = content.rfind("}")
+        if first != -1 and last != -1:
+            try:
+                return json.loads(content[first:last + 1])
+            except json.JSONDecodeError:
+                pass
+        raise RuntimeError("not valid JSON")
+
+
+def make_response(num_nurses: int, num_days: int) -> str:
+    start = date(2025, 7, 1)
+    shifts = ["AM", "PM", "Night", "REST"]
+    rows = [
+        json.dumps([f"N{i:03d}", (start + timedelta(days=d)).isoformat(), shifts[(i + d) % 4]])
+        for i in range(num_nurses) for d in range(num_days)
+    ]
+    return '{\n  "s": [\n    ' + ",\n    ".join(rows) + "\n  ]\n}"
+
+
+def variants(body: str) -> dict:
+    return {
+        "clean": body,
+        "prose + fence": "Here is the roster you asked for:\n```json\n" + body + "\n```\nLet me know!",
+        "trailing commas": body.replace("\n  ]", ",\n  ]"),
+    }
+
+
+def bench(label: str, body: str, number: int):
+    print(f"\n{label} ({len(body) / 1024:.0f} KiB)")
+    for name, text in variants(body).items():
+        try:
+            legacy_extract(text)
+            legacy = min(timeit.repeat(lambda: legacy_extract(text), number=number, repeat=3)) / number
+            legacy_ms = f"{legacy * 1e3:8.2f} ms"
+        except RuntimeError:
+            legacy_ms = "  failed   "
+        new = min(timeit.repeat(lambda: extract_schedule(text), number=number, repeat=3)) / number
+        print(f"  {name:16} legacy {legacy_ms}   extract_schedule {new * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    bench("25 nurses x 28 days", make_response(25, 28), 200)
+    bench("400 nurses x 90 days", make_response(400, 90), 5)
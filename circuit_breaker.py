@@ -0,0 +1,86 @@
+import threading
+import time
+import logging
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-provider health tracker.
+
+    closed    -> calls go through; consecutive failures are counted
+    open      -> calls are refused immediately until recovery_timeout elapses
+    half_open -> a single trial call is let through; success closes the
+                 circuit, failure re-opens it
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, recovery_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._last_error = None
+        self._lock = threading.Lock()
+
+    def _maybe_half_open(self):
+        # Caller must hold the lock
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Returns True if a call may be attempted now."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release(self):
+        """Gives back a half-open trial slot without recording an outcome (e.g. cancelled call)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logging.info(f"[CIRCUIT] {self.name} closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+            self._last_error = None
+
+    def record_failure(self, error: Exception = None):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if error is not None:
+                self._last_error = str(error)
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logging.warning(f"[CIRCUIT] {self.name} opened after {self._failures} failure(s)")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """Returns a JSON-serialisable view of the breaker for health reporting."""
+        with self._lock:
+            self._maybe_half_open()
+            retry_in = 0.0
+            if self._state == OPEN:
+                retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in_seconds": round(retry_in, 1),
+                "last_error": self._last_error,
+            }
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+# Mirrors the HARD rules in prompts.ROOT_PROMPT
+SHIFTS_PER_DAY = 3          # AM, PM, Night
+MIN_PER_SHIFT = 4           # rule 2: each shift >= 4 nurses
+MIN_SENIORS_PER_SHIFT = 1   # rule 2: each shift >= 1 senior
+MAX_WEEKLY_HOURS = 42       # rule 3
+MAX_SHIFT_HOURS = 10        # Night is the longest shift
+
+# Soft rules a relaxation stage can give up (keys used by app.schedule's stages)
+SHIFT_PREF = "shift_pref"
+AM_PCT = "am_pct"
+WEEKLY_HOURS = "weekly_hours"
+WEEKEND_ROTATION = "weekend_rotation"
+SOFT_RULES = frozenset({SHIFT_PREF, AM_PCT, WEEKLY_HOURS, WEEKEND_ROTATION})
+
+
+def _mc_dates(nurse: dict) -> set:
+    dates = set()
+    for d in nurse.get("mc_days", []):
+        try:
+            dates.add(datetime.fromisoformat(d).date())
+        except (TypeError, ValueError):
+            continue
+    return dates
+
+
+def check_feasibility(user_inputs: dict) -> dict:
+    """
+    Analytic capacity check of `user_inputs` against the rules, without any
+    LLM call. Returns:
+      feasible     -- False if no relaxation stage can satisfy the HARD rules
+      bottlenecks  -- days / week blocks where supply is below demand
+      must_relax   -- soft rules that cannot be met and must be relaxed
+    """
+    start = datetime.fromisoformat(user_inputs["start_date"]).date()
+    end = datetime.fromisoformat(user_inputs["end_date"]).date()
+    nurses = user_inputs.get("nurses", [])
+    total = len(nurses)
+    dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    mc = {n["name"]: _mc_dates(n) for n in nurses}
+
+    day_demand = SHIFTS_PER_DAY * MIN_PER_SHIFT
+    senior_demand = SHIFTS_PER_DAY * MIN_SENIORS_PER_SHIFT
+    bottlenecks = []
+    must_relax = set()
+    min_am_pct = user_inputs.get("min_am_pct", 60)
+
+    # --- 1. Per-day supply (nurses not on MC) ---
+    available_by_day = {}
+    for d in dates:
+        available = [n for n in nurses if d not in mc[n["name"]]]
+        seniors = sum(1 for n in available if n.get("senior"))
+        available_by_day[d] = (len(available), seniors)
+        if len(available) < day_demand or seniors < senior_demand:
+            bottlenecks.append({
+                "date": d.isoformat(),
+                "available": len(available),
+                "required": day_demand,
+                "seniors_available": seniors,
+                "seniors_required": senior_demand,
+            })
+        # AM% target: PM and Night need MIN_PER_SHIFT each, the rest can go to AM
+        elif total and (len(available) - 2 * MIN_PER_SHIFT) * 100 < min_am_pct * total:
+            must_relax.add(AM_PCT)
+
+    # --- 2. Per week block supply (every nurse needs >= 1 REST per full block) ---
+    weekly_hours = user_inputs.get("weekly_hours", 0) or 0
+    if weekly_hours > MAX_WEEKLY_HOURS:
+        must_relax.add(WEEKLY_HOURS)
+
+    for w in range(0, len(dates), 7):
+        block = dates[w:w + 7]
+        capacity = senior_capacity = 0
+        full = len(block) == 7
+        for n in nurses:
+            workable = sum(1 for d in block if d not in mc[n["name"]])
+            # The REST day and the weekly hour target only apply to full blocks
+            if full:
+                workable = min(workable, 6)
+                if workable * MAX_SHIFT_HOURS < weekly_hours:
+                    must_relax.add(WEEKLY_HOURS)
+            capacity += workable
+            if n.get("senior"):
+                senior_capacity += workable
+        if capacity < day_demand * len(block) or senior_capacity < senior_demand * len(block):
+            bottlenecks.append({
+                "week": w // 7 + 1,
+                "start": block[0].isoformat(),
+                "capacity": capacity,
+                "required": day_demand * len(block),
+                "senior_capacity": senior_capacity,
+                "seniors_required": senior_demand * len(block),
+            })
+
+    return {
+        "feasible": not bottlenecks,
+        "bottlenecks": bottlenecks,
+        "must_relax": sorted(must_relax),
+    }
+
+
+def first_viable_stage(stages: list, must_relax) -> int:
+    """Index of the first relaxation stage that relaxes every rule in `must_relax`."""
+    must_relax = set(must_relax)
+    for i, stage in enumerate(stages):
+        relaxes = stage.get("relaxes", frozenset())
+        if must_relax <= relaxes and len(must_relax) <= stage.get("max_relaxed", len(SOFT_RULES)):
+            return i
+    return len(stages) - 1
@@ -0,0 +1,91 @@
+import json
+import re
+from typing import List, Tuple
+
+_DECODER = json.JSONDecoder()
+
+# After locating the schedule key, entries are matched at the current position
+# (.match(text, pos)), so the tolerant scan reads the text once, left to right.
+_KEY = re.compile(r'"(?:s|schedule)"\s*:\s*\[')
+_STR = r'"((?:[^"\\]|\\.)*)"'
+# One entry (with its leading separators): a triple, a flat record, or the closing bracket
+_ENTRY = re.compile(
+    r'[\s,]*(?:'
+    r'\[\s*' + _STR + r'\s*,\s*' + _STR + r'\s*,\s*' + _STR + r'\s*,?\s*\]'
+    r'|(\{[^{}\[\]]*\})'
+    r'|(\]))'
+)
+_FIELD = re.compile(r'"(nurse|date|shift)"\s*:\s*' + _STR)
+
+
+def _unescape(s: str) -> str:
+    return json.loads(f'"{s}"') if "\\" in s else s
+
+
+def _decode(text: str, start: int):
+    """Decodes the JSON object at `start` and returns its schedule list, or None."""
+    try:
+        obj, _ = _DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(obj, dict):
+        schedule = obj.get("s") or obj.get("schedule")
+        if isinstance(schedule, list):
+            return schedule
+    return None
+
+
+def scan_schedule(text: str) -> Tuple[List[list], bool]:
+    """
+    Tolerant single pass over an LLM response.
+
+    Finds the "s"/"schedule" array (after any prose or code fence) and decodes
+    each [nurse, date, shift] triple or {"nurse", "date", "shift"} record
+    straight into a list of triples. Trailing commas are accepted. Returns
+    (entries, complete) where complete is False if the array was cut off.
+    Raises ValueError if no schedule array is found.
+    """
+    key = _KEY.search(text)
+    if key is None:
+        raise ValueError("No 's' or 'schedule' array in response")
+
+    entries = []
+    pos = key.end()
+    while True:
+        m = _ENTRY.match(text, pos)
+        if m is None:
+            return entries, False
+        nurse, date, shift, record, close = m.groups()
+        if close:
+            return entries, True
+        if record:
+            fields = {k: _unescape(v) for k, v in _FIELD.findall(record)}
+            if len(fields) != 3:
+                return entries, False
+            entries.append([fields["nurse"], fields["date"], fields["shift"]])
+        else:
+            entries.append([_unescape(nurse), _unescape(date), _unescape(shift)])
+        pos = m.end()
+
+
+def extract_schedule(text: str) -> dict:
+    """
+    Returns {"schedule": [...]} from an LLM response.
+
+    Well-formed JSON is decoded in place with the C decoder starting at the
+    first "{" (leading prose and fences are skipped without slicing). Anything
+    else (trailing commas, truncation) falls back to scan_schedule. Raises
+    ValueError if no complete schedule can be recovered.
+    """
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object in response")
+
+    schedule = _decode(text, start)
+    if schedule is not None:
+        return {"schedule": schedule}
+
+    entries, complete = scan_schedule(text)
+    if not complete:
+        raise ValueError(f"Schedule array is truncated after {len(entries)} entries")
+    return {"schedule": entries}
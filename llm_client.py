@@ -1,10 +1,13 @@
 import os
-import json
-import re
-from typing import Dict
-from prompts import build_prompt
+import asyncio
+from typing import Dict, List
+from prompts import build_prompt, build_continuation_prompt
 import logging
 from dotenv import load_dotenv
+from circuit_breaker import CircuitBreaker
+from log_config import setup_logging, log_payload, truncate
+from json_extract import extract_schedule, scan_schedule
+from roster import Roster, shift_code
 
 # Lazy imports for providers
 try:
@@ -16,16 +19,16 @@ try:
 except ImportError:
     anthropic = None
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-logging.basicConfig(
-    filename="scheduler.log",
-    filemode="a",
-    level=logging.DEBUG,
-    format="%(asctime)s %(levelname)s %(message)s"
-)
+setup_logging("scheduler.log")
 
 load_dotenv()
 
@@ -40,223 +43,549 @@ anthropic_model = os.getenv("ANTHROPIC_MODEL", "claude-3-sonnet-20240229")
 deepseek_api_key = os.getenv("DEEPSEEK_API_KEY")
 deepseek_model = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
 
-def call_llm(prompt: str) -> Dict:
-    """Calls the configured AI provider and returns parsed JSON schedule."""
-    
-    if provider == "openai":
-        if openai is None:
-            raise RuntimeError("openai package not installed")
-        openai.api_key = openai_api_key
-        resp = openai.ChatCompletion.create(
-            model=openai_model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.0,
-            functions=[{
-                "name": "return_schedule",
-                "parameters": {
+# Failover chain: the primary provider first, then PROVIDER_FALLBACKS in order
+# (comma separated, e.g. "openrouter,deepseek")
+provider_fallbacks = [
+    p.strip() for p in os.getenv("PROVIDER_FALLBACKS", "").split(",")
+    if p.strip() and p.strip() != provider
+]
+provider_chain = [provider] + provider_fallbacks
+
+# Circuit breaker tuning
+circuit_failure_threshold = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 3))
+circuit_recovery_seconds = float(os.getenv("CIRCUIT_RECOVERY_SECONDS", 60))
+
+# Connection pool size of the shared async HTTP client (ASGI mode)
+async_max_connections = int(os.getenv("ASYNC_MAX_CONNECTIONS", 200))
+
+# Follow-up requests allowed to complete one truncated roster
+max_continuations = int(os.getenv("LLM_MAX_CONTINUATIONS", 4))
+
+
+class ProviderUnavailable(RuntimeError):
+    """The provider could not be reached or refused the request (counts against its circuit)."""
+
+
+class TruncatedOutput(RuntimeError):
+    """The completion hit the token limit; `entries` holds the triples salvaged before the cut."""
+
+    def __init__(self, source: str, entries: list):
+        super().__init__(f"{source} response was truncated after {len(entries)} entries")
+        self.entries = entries
+
+
+_breakers = {
+    name: CircuitBreaker(name, circuit_failure_threshold, circuit_recovery_seconds)
+    for name in provider_chain
+}
+
+
+def provider_health() -> Dict:
+    """Returns circuit breaker state for every provider in the failover chain."""
+    return {
+        "primary": provider,
+        "chain": provider_chain,
+        "providers": {name: _breakers[name].snapshot() for name in provider_chain},
+    }
+
+
+def _parse_schedule(content: str, source: str, truncated: bool = False) -> Dict:
+    """
+    Shared tolerant extraction of the schedule from any provider's text output.
+    Truncation is taken from the provider's finish reason: a cut-off output
+    raises TruncatedOutput with the salvaged entries, anything else must parse
+    (ValueError otherwise, so the relaxation ladder moves on to the next stage).
+    """
+    if not truncated:
+        try:
+            return extract_schedule(content)
+        except ValueError as e:
+            raise ValueError(f"{source} response was not valid JSON ({e}). Raw content:\n{truncate(content)}")
+
+    try:
+        entries, _ = scan_schedule(content)
+    except ValueError:
+        entries = []
+    logging.warning(f"[TRUNCATED] {source} output cut off after {len(entries)} entries")
+    raise TruncatedOutput(source, entries)
+
+
+_OPENAI_FUNCTIONS = [{
+    "name": "return_schedule",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "schedule": {
+                "type": "array",
+                "items": {
                     "type": "object",
                     "properties": {
-                        "schedule": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "nurse": {"type": "string"},
-                                    "date": {"type": "string", "format": "date"},
-                                    "shift": {"type": "string", "enum": ["AM", "PM", "Night"]}
-                                },
-                                "required": ["nurse", "date", "shift"]
-                            }
-                        }
+                        "nurse": {"type": "string"},
+                        "date": {"type": "string", "format": "date"},
+                        "shift": {"type": "string", "enum": ["AM", "PM", "Night"]}
                     },
-                    "required": ["schedule"]
+                    "required": ["nurse", "date", "shift"]
                 }
-            }],
-            function_call={"name": "return_schedule"}
+            }
+        },
+        "required": ["schedule"]
+    }
+}]
+
+
+def _openai_request(prompt: str) -> Dict:
+    return dict(
+        model=openai_model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.0,
+        functions=_OPENAI_FUNCTIONS,
+        function_call={"name": "return_schedule"}
+    )
+
+
+def _openai_result(resp) -> Dict:
+    args = resp.choices[0].message.function_call.arguments
+    return _parse_schedule(args, "OpenAI", resp.choices[0].finish_reason == "length")
+
+
+def _call_openai(prompt: str) -> Dict:
+    if openai is None:
+        raise ProviderUnavailable("openai package not installed")
+    openai.api_key = openai_api_key
+    try:
+        resp = openai.ChatCompletion.create(**_openai_request(prompt))
+    except Exception as e:
+        raise ProviderUnavailable(f"OpenAI request failed: {e}")
+    return _openai_result(resp)
+
+
+def _anthropic_request(prompt: str) -> Dict:
+    return dict(
+        prompt=prompt,
+        model=anthropic_model,
+        temperature=0.2,
+        max_tokens=2000
+    )
+
+
+def _anthropic_result(resp) -> Dict:
+    return _parse_schedule(resp.completion, "Anthropic", resp.stop_reason == "max_tokens")
+
+
+def _call_anthropic(prompt: str) -> Dict:
+    if anthropic is None:
+        raise ProviderUnavailable("anthropic package not installed")
+    client = anthropic.Client(api_key=anthropic_api_key)
+    try:
+        resp = client.completions.create(**_anthropic_request(prompt))
+    except Exception as e:
+        raise ProviderUnavailable(f"Anthropic request failed: {e}")
+    return _anthropic_result(resp)
+
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+
+def _openrouter_request(prompt: str):
+    headers = {
+        "Authorization": f"Bearer {openrouter_api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost"
+    }
+
+    payload = {
+        "model": openrouter_model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.2,
+        "max_tokens": 25000
+    }
+    return headers, payload
+
+
+def _openrouter_result(resp) -> Dict:
+    """Handles an OpenRouter response (requests or httpx)."""
+    log_payload("openrouter.http_response", resp.text, preview=False)
+    if resp.status_code >= 400:
+        if resp.status_code == 429:
+            # Print rate limit reset time if available
+            reset_timestamp = resp.headers.get("X-RateLimit-Reset")
+            if reset_timestamp:
+                from datetime import datetime
+                reset_dt = datetime.fromtimestamp(int(reset_timestamp) / 1000)
+                logging.error(f"Rate limit exceeded. Try again at {reset_dt} (X-RateLimit-Reset)")
+            else:
+                logging.error("Rate limit exceeded (429). No reset time provided.")
+            raise ProviderUnavailable("Rate limit exceeded (429). Please wait before retrying.")
+
+        logging.error(f"HTTP error: {resp.status_code}")
+        logging.error(f"Response: {truncate(resp.text)}")
+        raise ProviderUnavailable(f"OpenRouter HTTP error: {resp.status_code}")
+
+    choice = resp.json()["choices"][0]
+    content = choice["message"]["content"]
+    log_payload("openrouter.content", content)
+    if not content.strip():
+        raise RuntimeError("LLM response was empty.")
+
+    return _parse_schedule(content, "LLM", choice.get("finish_reason") == "length")
+
+
+def _call_openrouter(prompt: str) -> Dict:
+    headers, payload = _openrouter_request(prompt)
+    try:
+        resp = requests.post(OPENROUTER_URL, headers=headers, json=payload)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"OpenRouter request failed: {e}")
+        raise ProviderUnavailable(f"Failed to communicate with OpenRouter API: {e}")
+    return _openrouter_result(resp)
+
+
+DEEPSEEK_URL = "https://api.deepseek.com/chat/completions"
+DEEPSEEK_RETRIES = 3
+DEEPSEEK_RETRY_STATUSES = [429, 500, 502, 503, 504]
+DEEPSEEK_TIMEOUT = 120
+
+
+def _deepseek_request(prompt: str):
+    headers = {
+        "Authorization": f"Bearer {deepseek_api_key}",
+        "Content-Type": "application/json"
+    }
+
+    payload = {
+        "model": deepseek_model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.3,
+        # "max_tokens": 7000,
+        "stream": False
+    }
+    return headers, payload
+
+
+def _deepseek_result(resp) -> Dict:
+    """Handles a DeepSeek response (requests or httpx) after retries."""
+    if resp.status_code >= 400:
+        logging.error(f"DeepSeek API request failed: HTTP {resp.status_code}")
+        logging.error(f"Response body: {truncate(resp.text)}")
+        raise ProviderUnavailable("Failed to communicate with DeepSeek API")
+
+    log_payload("deepseek.http_response", resp.text, preview=False)
+    response_data = resp.json()
+
+    # Extract token usage
+    usage = response_data.get('usage', {})
+    prompt_tokens = usage.get('prompt_tokens', 0)
+    completion_tokens = usage.get('completion_tokens', 0)
+    total_tokens = usage.get('total_tokens', 0)
+
+    logging.info(
+        f"Token usage: Prompt={prompt_tokens}, "
+        f"Completion={completion_tokens}, "
+        f"Total={total_tokens}"
+    )
+
+    # Extract content from correct response structure
+    choice = response_data["choices"][0]
+    content = choice["message"]["content"]
+    log_payload("deepseek.content", content)
+
+    return _parse_schedule(content, "DeepSeek", choice.get("finish_reason") == "length")
+
+
+def _call_deepseek(prompt: str) -> Dict:
+    headers, payload = _deepseek_request(prompt)
+
+    try:
+        # Create session with retry mechanism
+        session = requests.Session()
+        retry_strategy = Retry(
+            total=DEEPSEEK_RETRIES,
+            backoff_factor=1,
+            status_forcelist=DEEPSEEK_RETRY_STATUSES,
+            allowed_methods=["POST"]
         )
-        args = resp.choices[0].message.function_call.arguments
-        return json.loads(args)
-
-    elif provider == "anthropic":
-        if anthropic is None:
-            raise RuntimeError("anthropic package not installed")
-        client = anthropic.Client(api_key=anthropic_api_key)
-        resp = client.completions.create(
-            prompt=prompt,
-            model=anthropic_model,
-            temperature=0.2,
-            max_tokens=2000
+        adapter = HTTPAdapter(max_retries=retry_strategy)
+        session.mount("https://", adapter)
+
+        # Increase timeout to 120 seconds
+        resp = session.post(DEEPSEEK_URL, headers=headers, json=payload, timeout=DEEPSEEK_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"DeepSeek API request failed: {str(e)}")
+        raise ProviderUnavailable("Failed to communicate with DeepSeek API")
+    return _deepseek_result(resp)
+
+
+_PROVIDERS = {
+    "openai": _call_openai,
+    "anthropic": _call_anthropic,
+    "openrouter": _call_openrouter,
+    "deepseek": _call_deepseek,
+}
+
+
+# === Async provider clients (used by asgi_app) ===
+
+_async_http = None
+_async_anthropic = None
+
+
+def _http_client():
+    """Shared httpx.AsyncClient, so concurrent requests reuse connections."""
+    global _async_http
+    if httpx is None:
+        raise ProviderUnavailable("httpx package not installed")
+    if _async_http is None:
+        _async_http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=async_max_connections, max_keepalive_connections=20)
         )
-        return json.loads(resp.completion)
-
-    elif provider == "openrouter":
-        headers = {
-            "Authorization": f"Bearer {openrouter_api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost"
-        }
-
-        payload = {
-            "model": openrouter_model,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2,
-            "max_tokens": 25000
-        }
-
-        url = "https://openrouter.ai/api/v1/chat/completions"
-        resp = requests.post(url, headers=headers, json=payload)
-        logging.info(f"[LLM FULL RESPONSE] {resp.text}")
+    return _async_http
+
+
+def _anthropic_client():
+    """Shared anthropic.AsyncClient, so concurrent requests reuse its connection pool."""
+    global _async_anthropic
+    if _async_anthropic is None:
+        _async_anthropic = anthropic.AsyncClient(api_key=anthropic_api_key)
+    return _async_anthropic
+
+
+async def aclose():
+    """Closes the shared async clients (call on application shutdown)."""
+    global _async_http, _async_anthropic
+    if _async_http is not None:
+        await _async_http.aclose()
+        _async_http = None
+    if _async_anthropic is not None:
+        await _async_anthropic.close()
+        _async_anthropic = None
+
+
+async def _acall_openai(prompt: str) -> Dict:
+    if openai is None:
+        raise ProviderUnavailable("openai package not installed")
+    openai.api_key = openai_api_key
+    try:
+        resp = await openai.ChatCompletion.acreate(**_openai_request(prompt))
+    except Exception as e:
+        raise ProviderUnavailable(f"OpenAI request failed: {e}")
+    return _openai_result(resp)
+
+
+async def _acall_anthropic(prompt: str) -> Dict:
+    if anthropic is None:
+        raise ProviderUnavailable("anthropic package not installed")
+    try:
+        resp = await _anthropic_client().completions.create(**_anthropic_request(prompt))
+    except Exception as e:
+        raise ProviderUnavailable(f"Anthropic request failed: {e}")
+    return _anthropic_result(resp)
+
+
+async def _acall_openrouter(prompt: str) -> Dict:
+    client = _http_client()
+    headers, payload = _openrouter_request(prompt)
+    try:
+        resp = await client.post(OPENROUTER_URL, headers=headers, json=payload, timeout=None)
+    except httpx.HTTPError as e:
+        logging.error(f"OpenRouter request failed: {e}")
+        raise ProviderUnavailable(f"Failed to communicate with OpenRouter API: {e}")
+    return _openrouter_result(resp)
+
+
+async def _acall_deepseek(prompt: str) -> Dict:
+    client = _http_client()
+    headers, payload = _deepseek_request(prompt)
+    # Same policy as the sync Retry adapter: 3 retries, backoff 1s, 2s, 4s
+    for attempt in range(DEEPSEEK_RETRIES + 1):
+        last_attempt = attempt == DEEPSEEK_RETRIES
         try:
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            if resp.status_code == 429:
-                # Print rate limit reset time if available
-                reset_timestamp = resp.headers.get("X-RateLimit-Reset")
-                if reset_timestamp:
-                    from datetime import datetime
-                    reset_dt = datetime.fromtimestamp(int(reset_timestamp) / 1000)
-                    logging.error(f"Rate limit exceeded. Try again at {reset_dt} (X-RateLimit-Reset)")
-                else:
-                    logging.error("Rate limit exceeded (429). No reset time provided.")
-                raise RuntimeError("Rate limit exceeded (429). Please wait before retrying.")
-            
-            logging.error(f"HTTP error: {e}")
-            logging.error(f"Response: {resp.text}")
+            resp = await client.post(DEEPSEEK_URL, headers=headers, json=payload, timeout=DEEPSEEK_TIMEOUT)
+        except httpx.HTTPError as e:
+            logging.error(f"DeepSeek API request failed: {str(e)}")
+            if last_attempt:
+                raise ProviderUnavailable("Failed to communicate with DeepSeek API")
+        else:
+            if resp.status_code not in DEEPSEEK_RETRY_STATUSES or last_attempt:
+                return _deepseek_result(resp)
+        await asyncio.sleep(2 ** attempt)
+
+
+_ASYNC_PROVIDERS = {
+    "openai": _acall_openai,
+    "anthropic": _acall_anthropic,
+    "openrouter": _acall_openrouter,
+    "deepseek": _acall_deepseek,
+}
+
+
+def call_llm(prompt: str) -> Dict:
+    """
+    Calls the configured AI provider and returns parsed JSON schedule.
+
+    Providers are tried in failover order. A provider whose circuit is open is
+    skipped without a network call; transport/HTTP failures count against its
+    circuit and move on to the next provider. Errors in the model output itself
+    (empty or invalid JSON) are raised as-is since the provider is healthy.
+    """
+    failures: List[str] = []
+
+    for name in provider_chain:
+        call = _PROVIDERS.get(name)
+        if call is None:
+            raise RuntimeError(f"Unsupported provider: {name}")
+
+        breaker = _breakers[name]
+        if not breaker.allow():
+            failures.append(f"{name}: circuit open")
+            continue
+
+        try:
+            result = call(prompt)
+        except ProviderUnavailable as e:
+            breaker.record_failure(e)
+            failures.append(f"{name}: {e}")
+            logging.warning(f"[FAILOVER] {name} unavailable: {e}")
+            continue
+        except Exception:
+            # The provider answered; the content was the problem
+            breaker.record_success()
+            raise
+
+        breaker.record_success()
+        if name != provider:
+            logging.info(f"[FAILOVER] Served by fallback provider {name}")
+        return result
+
+    raise ProviderUnavailable("All providers unavailable: " + "; ".join(failures))
+
+
+async def acall_llm(prompt: str) -> Dict:
+    """Async call_llm: same failover and circuit breakers, non-blocking provider I/O."""
+    failures: List[str] = []
+
+    for name in provider_chain:
+        call = _ASYNC_PROVIDERS.get(name)
+        if call is None:
+            raise RuntimeError(f"Unsupported provider: {name}")
+
+        breaker = _breakers[name]
+        if not breaker.allow():
+            failures.append(f"{name}: circuit open")
+            continue
+
+        try:
+            result = await call(prompt)
+        except ProviderUnavailable as e:
+            breaker.record_failure(e)
+            failures.append(f"{name}: {e}")
+            logging.warning(f"[FAILOVER] {name} unavailable: {e}")
+            continue
+        except asyncio.CancelledError:
+            # Client went away; this says nothing about the provider's health
+            breaker.release()
             raise
-        except requests.exceptions.HTTPError as e:
-            logging.info(f"HTTP error: {e}")
-            logging.info(f"Response: {resp.text}")
+        except Exception:
+            breaker.record_success()
             raise
 
-        content = resp.json()["choices"][0]["message"]["content"]
-        logging.info(f"[LLM RAW OUTPUT] {content}")
-        if not content.strip():
-            raise RuntimeError("LLM response was empty.")
+        breaker.record_success()
+        if name != provider:
+            logging.info(f"[FAILOVER] Served by fallback provider {name}")
+        return result
+
+    raise ProviderUnavailable("All providers unavailable: " + "; ".join(failures))
+
+
+def _merge_cells(roster: Roster, entries: list) -> int:
+    """
+    Fills unassigned cells of `roster` from LLM entries and returns how many
+    were added. Entries for unknown nurses/dates, invalid shifts, or cells that
+    are already assigned (the salvaged part is authoritative) are dropped.
+    """
+    added = 0
+    for entry in entries:
+        try:
+            if isinstance(entry, dict):
+                nurse, d, shift = entry["nurse"], entry["date"], entry["shift"]
+            else:
+                nurse, d, shift = entry
+            i, j = roster.nurse_index(nurse), roster.date_index(d)
+            code = shift_code(shift)
+        except (KeyError, ValueError, TypeError):
+            continue
+        if roster.shifts[i, j]:
+            continue
+        roster.shifts[i, j] = code
+        added += 1
+    return added
+
+
+def _schedule_steps(prompt: str, user_inputs: dict):
+    """
+    The generation protocol, independent of sync/async I/O: yields each prompt
+    to send and is sent back the call_llm result (or the TruncatedOutput it
+    raised). Returns the schedule. If the first completion is truncated, the
+    salvaged cells are kept and follow-up prompts ask only for the missing
+    (nurse, date) cells, up to LLM_MAX_CONTINUATIONS times.
+    Raises ValueError if no complete schedule could be obtained.
+    """
+    result = yield prompt
+    if not isinstance(result, TruncatedOutput):
+        schedule = result.get("s") or result.get("schedule")
+        if not schedule:
+            raise ValueError("Missing 'schedule' in LLM response")
+        return schedule
 
-        # Robust JSON extraction
+    roster = Roster.empty(
+        [n["name"] for n in user_inputs["nurses"]], user_inputs["start_date"], user_inputs["end_date"]
+    )
+    _merge_cells(roster, result.entries)
+
+    for attempt in range(1, max_continuations + 1):
+        missing = int((roster.shifts == 0).sum())
+        if not missing:
+            break
+        logging.info(f"[CONTINUATION {attempt}] Requesting {missing} missing cells")
+        result = yield build_continuation_prompt(prompt, roster)
+        if isinstance(result, TruncatedOutput):
+            entries = result.entries
+        else:
+            entries = result.get("s") or result.get("schedule") or []
+        if not _merge_cells(roster, entries):
+            logging.warning(f"[CONTINUATION {attempt}] No usable cells returned; giving up")
+            break
+
+    missing = int((roster.shifts == 0).sum())
+    if missing:
+        raise ValueError(f"Truncated LLM output could not be completed: {missing} cells missing")
+    return roster.to_triples()
+
+
+def generate_schedule(prompt: str, user_inputs: dict) -> list:
+    """Returns the schedule for `prompt`, completing truncated output (see _schedule_steps)."""
+    steps = _schedule_steps(prompt, user_inputs)
+    request = next(steps)
+    while True:
         try:
-            return json.loads(content)
-        except json.JSONDecodeError:
-            # Try JSON-looking object anywhere in text
-            match = re.search(r'\{[\s\S]*\}', content)
-            if match:
-                try:
-                    return json.loads(match.group())
-                except json.JSONDecodeError:
-                    pass
-
-            # Try fenced code block
-            fenced = re.search(r"```json\s*([\s\S]*?)\s*```", content)
-            if fenced:
-                try:
-                    return json.loads(fenced.group(1).strip())
-                except json.JSONDecodeError:
-                    pass
-
-            first = content.find("{")
-            last  = content.rfind("}")
-            if first != -1 and last != -1:
-                json_str = content[first:last+1]
-                try:
-                    return json.loads(json_str)
-                except json.JSONDecodeError:
-                    pass
-
-            # Final fallback: raise with full content
-            raise RuntimeError(f"LLM response was not valid JSON. Raw content:\n{content}")
-        
-    if provider == "deepseek":
-        headers = {
-            "Authorization": f"Bearer {deepseek_api_key}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": deepseek_model,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3,
-            # "max_tokens": 7000,
-            "stream": False
-        }
-
-        url = "https://api.deepseek.com/chat/completions"
-        
+            result = call_llm(request)
+        except TruncatedOutput as t:
+            result = t
         try:
-            # Create session with retry mechanism
-            session = requests.Session()
-            retry_strategy = Retry(
-                total=3,
-                backoff_factor=1,
-                status_forcelist=[429, 500, 502, 503, 504],
-                allowed_methods=["POST"]
-            )
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            session.mount("https://", adapter)
-            
-            # Increase timeout to 120 seconds
-            resp = session.post(url, headers=headers, json=payload, timeout=120)
-            resp.raise_for_status()
-            logging.info(f"[DEEPSEEK FULL RESPONSE] {resp.text}")  # <-- Add this line
-            response_data = resp.json()
-
-            # Extract token usage
-            usage = response_data.get('usage', {})
-            prompt_tokens = usage.get('prompt_tokens', 0)
-            completion_tokens = usage.get('completion_tokens', 0)
-            total_tokens = usage.get('total_tokens', 0)
-            
-            logging.info(
-                f"Token usage: Prompt={prompt_tokens}, "
-                f"Completion={completion_tokens}, "
-                f"Total={total_tokens}"
-            )
-            
-            # Extract content from correct response structure
-            content = response_data["choices"][0]["message"]["content"]
-            logging.info(f"[DEEPSEEK RESPONSE] {content}")
-
-            if content.strip().startswith("```"):
-                content = re.sub(r"^```(?:json)?\s*|```$", "", content.strip(), flags=re.MULTILINE).strip()
-            
-            # Robust JSON extraction (same as before)
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                # Try JSON-looking object anywhere in text
-                match = re.search(r'\{[\s\S]*\}', content)
-                if match:
-                    try:
-                        return json.loads(match.group())
-                    except json.JSONDecodeError:
-                        pass
-
-                # Try fenced code block
-                fenced = re.search(r"```json\s*([\s\S]*?)\s*```", content)
-                if fenced:
-                    try:
-                        return json.loads(fenced.group(1).strip())
-                    except json.JSONDecodeError:
-                        pass
-
-                first = content.find("{")
-                last  = content.rfind("}")
-                if first != -1 and last != -1:
-                    json_str = content[first:last+1]
-                    try:
-                        return json.loads(json_str)
-                    except json.JSONDecodeError:
-                        pass
-
-                # Final fallback: raise with full content
-                raise RuntimeError(f"DeepSeek response was not valid JSON. Raw content:\n{content}")
-                
-        except requests.exceptions.RequestException as e:
-            logging.error(f"DeepSeek API request failed: {str(e)}")
-            if e.response is not None:
-                logging.error(f"Response status: {e.response.status_code}")
-                logging.error(f"Response body: {e.response.text}")
-            raise RuntimeError("Failed to communicate with DeepSeek API")
+            request = steps.send(result)
+        except StopIteration as done:
+            return done.value
 
 
-    else:
-        raise RuntimeError(f"Unsupported provider: {provider}")
+async def agenerate_schedule(prompt: str, user_inputs: dict) -> list:
+    """Async generate_schedule."""
+    steps = _schedule_steps(prompt, user_inputs)
+    request = next(steps)
+    while True:
+        try:
+            result = await acall_llm(request)
+        except TruncatedOutput as t:
+            result = t
+        try:
+            request = steps.send(result)
+        except StopIteration as done:
+            return done.value
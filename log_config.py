@@ -0,0 +1,154 @@
+import atexit
+import contextvars
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import uuid
+from datetime import datetime, timezone
+
+# Read environment variables
+log_level = os.getenv("LOG_LEVEL", "DEBUG")
+# Longest message written to the main log; longer ones are cut with a marker
+log_max_chars = int(os.getenv("LOG_MAX_CHARS", 2000))
+# Optional gzip JSON-lines archive of full LLM payloads ("" disables it)
+payload_archive = os.getenv("LOG_PAYLOAD_ARCHIVE", "")
+# Fraction of payloads written to the archive
+payload_sample_rate = float(os.getenv("LOG_PAYLOAD_SAMPLE", 1.0))
+
+# Correlation id of the request being handled (works for threads and asyncio tasks)
+request_id = contextvars.ContextVar("request_id", default="-")
+
+_listeners = []
+_configured = False
+_lock = threading.Lock()
+
+
+def new_request_id(value: str = None) -> str:
+    """Sets (or generates) the correlation id for the current request and returns it."""
+    rid = value or uuid.uuid4().hex[:16]
+    request_id.set(rid)
+    return rid
+
+
+def truncate(text: str, limit: int = None) -> str:
+    limit = log_max_chars if limit is None else limit
+    if text is None or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [truncated {len(text) - limit} chars]"
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps each record with the current correlation id (runs on the caller's thread)."""
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; messages longer than LOG_MAX_CHARS are truncated."""
+
+    EXTRA_FIELDS = ("payload_kind", "payload_chars")
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": truncate(record.getMessage()),
+        }
+        for field in self.EXTRA_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class GzipJsonLinesHandler(logging.Handler):
+    """Appends full payload records to a gzip JSON-lines file (one gzip member per run)."""
+
+    def __init__(self, filename: str):
+        super().__init__()
+        self._file = gzip.open(filename, "at", encoding="utf-8")
+
+    def emit(self, record):
+        try:
+            self._file.write(json.dumps({
+                "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+                "request_id": getattr(record, "request_id", "-"),
+                "kind": getattr(record, "payload_kind", None),
+                "payload": record.payload,
+            }, ensure_ascii=False) + "\n")
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def _queue_logger(logger: logging.Logger, handler: logging.Handler):
+    """Routes `logger` through a queue; `handler` does the I/O on a background thread."""
+    q = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(q)
+    queue_handler.addFilter(RequestIdFilter())
+    logger.addHandler(queue_handler)
+    listener = logging.handlers.QueueListener(q, handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+
+def setup_logging(filename: str) -> None:
+    """
+    Configures non-blocking JSON logging to `filename`. Only the first call
+    in a process takes effect, matching logging.basicConfig.
+    """
+    global _configured
+    with _lock:
+        if _configured:
+            return
+        _configured = True
+
+        root = logging.getLogger()
+        root.setLevel(log_level)
+        file_handler = logging.FileHandler(filename, mode="a", encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        _queue_logger(root, file_handler)
+
+        if payload_archive:
+            payloads = logging.getLogger("payloads")
+            payloads.setLevel(logging.DEBUG)
+            payloads.propagate = False
+            _queue_logger(payloads, GzipJsonLinesHandler(payload_archive))
+
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Drains the queues and closes the handlers."""
+    while _listeners:
+        listener = _listeners.pop()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def log_payload(kind: str, text: str, preview: bool = True) -> None:
+    """
+    Logs a large LLM payload: a truncated preview in the main log (unless
+    preview=False) and, if LOG_PAYLOAD_ARCHIVE is set, the full text in the
+    archive for a LOG_PAYLOAD_SAMPLE fraction of calls.
+    """
+    text = text or ""
+    extra = {"payload_kind": kind, "payload_chars": len(text)}
+    if preview:
+        logging.debug(f"[{kind}] {truncate(text)}", extra=extra)
+    if payload_archive and random.random() < payload_sample_rate:
+        logging.getLogger("payloads").debug(kind, extra=dict(extra, payload=text))
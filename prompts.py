@@ -1,4 +1,5 @@
 import pandas as pd
+from warm_start import build_previous_block
 
 ROOT_PROMPT = """
 You are a professional nurse‑rostering engine.
@@ -76,7 +77,7 @@ SOFT CONSTRAINTS (OPTIMIZE):
 
 10. Preference Fulfillment:
    - Assign nurses to their preferred shifts where feasible, without violating any Hard rules
-
+{previous_period_block}
 OUTPUT REQUIREMENTS:
 - PURE JSON ONLY (no text, explanations, markdown, or code fences)
 - Output ONLY the JSON object, nothing else.
@@ -125,7 +126,10 @@ def build_prompt(user_inputs: dict) -> str:
         f"- {n['name']}: prefers {n.get('shift_pref', 'none')}" for n in nurses
     ) if nurses else "None"
 
-    # --- 5. Build and return ---
+    # --- 5. Previous period (warm start) block ---
+    previous_period_block = build_previous_block(user_inputs.get("previous_schedule"), start)
+
+    # --- 6. Build and return ---
     return ROOT_PROMPT.format(
         start_date=start,
         end_date=end,
@@ -139,7 +143,45 @@ def build_prompt(user_inputs: dict) -> str:
         num_mc=num_mc,
         medical_leaves_block=medical_leaves_block,
         shift_prefs_block=shift_prefs_block,
+        previous_period_block=previous_period_block,
         weekly_hours=user_inputs["weekly_hours"],
         min_am_pct=user_inputs.get("min_am_pct", 60),
         snr_min_am_pct=user_inputs.get("snr_min_am_pct", 60)
-    )
\ No newline at end of file
+    )
+
+CONTINUATION_PROMPT = """
+CONTINUATION (previous answer was cut off):
+The cells below are ALREADY ASSIGNED and FIXED. Do not repeat or change them; use them
+to satisfy every rule above (coverage, weekly hours, REST streaks, Night→AM) together
+with the cells you add. One letter per day from {start_date}
+(A=AM, P=PM, N=Night, R=REST, M=MC, -=missing):
+  {fixed_rows}
+
+Return ONLY the {num_missing} missing cells listed below, in the same JSON format
+({{"s": [["<nurse_id>", "<YYYY‑MM‑DD>", "<AM|PM|Night|REST|MC>"], ...]}}). This overrides
+"Total entries" above.
+  {missing_block}
+"""
+
+def build_continuation_prompt(prompt: str, roster) -> str:
+    """Appends a request for only the unassigned cells of `roster` to the original prompt."""
+    missing_lines = []
+    for i, nurse in enumerate(roster.nurses):
+        cols = (roster.shifts[i] == 0).nonzero()[0].tolist()
+        if not cols:
+            continue
+        # Collapse consecutive missing days into ranges to keep the prompt small
+        ranges, run_start = [], cols[0]
+        for prev, cur in zip(cols, cols[1:] + [None]):
+            if cur != prev + 1:
+                first, last = roster.iso_dates[run_start], roster.iso_dates[prev]
+                ranges.append(first if first == last else f"{first}..{last}")
+                run_start = cur
+        missing_lines.append(f"- {nurse}: {', '.join(ranges)}")
+
+    return prompt + CONTINUATION_PROMPT.format(
+        start_date=roster.iso_dates[0],
+        fixed_rows="\n  ".join(f"{nurse}: {roster.letters(nurse)}" for nurse in roster.nurses),
+        num_missing=int((roster.shifts == 0).sum()),
+        missing_block="\n  ".join(missing_lines),
+    )
@@ -0,0 +1,158 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+# Shift codes stored in the matrix. 0 means "no assignment".
+SHIFTS = (None, "AM", "PM", "Night", "REST", "MC")
+UNASSIGNED, AM, PM, NIGHT, REST, MC = range(len(SHIFTS))
+WORKING = (AM, PM, NIGHT)
+
+# Accept any casing from the LLM ("night", "NIGHT", ...) but store canonical names
+SHIFT_CODES = {s.upper(): code for code, s in enumerate(SHIFTS) if s}
+
+# Per-code lookup tables (index with the shift matrix directly)
+SHIFT_NAMES = np.array(SHIFTS, dtype=object)
+SHIFT_HOURS = np.array([0, 7, 7, 10, 0, 0], dtype=np.uint8)
+
+# One letter per code, used wherever a roster row has to be compact (prompts, store)
+LETTERS = "-APNRM"
+_LETTER_BYTES = np.frombuffer(LETTERS.encode("ascii"), dtype=np.uint8)
+
+
+def shift_code(shift: str) -> int:
+    """Returns the matrix code for a shift name (raises ValueError)."""
+    try:
+        return SHIFT_CODES[shift.upper()]
+    except (KeyError, AttributeError):
+        raise ValueError(f"Invalid shift in schedule: {shift}")
+
+
+def _parse_date(d) -> date:
+    if isinstance(d, date):
+        return d
+    try:
+        return datetime.fromisoformat(d).date()
+    except Exception:
+        raise ValueError(f"Invalid date in schedule: {d}")
+
+
+class Roster:
+    """
+    A schedule as a nurse x date matrix of uint8 shift codes.
+
+    `nurses` and `dates` are the row/column indexes; `dates` holds parsed
+    datetime.date objects and `iso_dates` the matching YYYY-MM-DD strings, so
+    no caller has to parse dates again.
+    """
+
+    __slots__ = ("nurses", "dates", "iso_dates", "shifts", "_nurse_pos", "_date_pos")
+
+    def __init__(self, nurses: List[str], dates: List[date], shifts: Optional[np.ndarray] = None):
+        self.nurses = list(nurses)
+        self.dates = list(dates)
+        self.iso_dates = [d.isoformat() for d in self.dates]
+        self._nurse_pos = {n: i for i, n in enumerate(self.nurses)}
+        self._date_pos = {d: j for j, d in enumerate(self.iso_dates)}
+        if shifts is None:
+            shifts = np.zeros((len(self.nurses), len(self.dates)), dtype=np.uint8)
+        self.shifts = shifts
+
+    # --- Construction ---
+
+    @classmethod
+    def empty(cls, nurses: Iterable[str], start, end) -> "Roster":
+        """An unassigned roster covering start..end inclusive."""
+        start, end = _parse_date(start), _parse_date(end)
+        num_days = (end - start).days + 1
+        return cls(nurses, [start + timedelta(days=i) for i in range(num_days)])
+
+    @classmethod
+    def from_wire(cls, schedule: list, nurses: Iterable[str] = None, start=None, end=None) -> "Roster":
+        """
+        Builds a roster from the JSON wire format: [nurse, date, shift] triples
+        or {"nurse", "date", "shift"} dicts.
+
+        Rows follow `nurses` (then any other nurse in order of appearance).
+        Columns cover start..end if given, plus any other date seen, sorted.
+        Raises ValueError on bad dates/shifts or duplicate (nurse, date) cells.
+        """
+        parsed = {}      # date string -> date, so each distinct string is parsed once
+        cells = []
+        nurse_order = dict.fromkeys(nurses or [])
+        for entry in schedule or []:
+            if isinstance(entry, dict):
+                nurse, d, shift = entry["nurse"], entry["date"], entry["shift"]
+            else:
+                nurse, d, shift = entry
+            if d not in parsed:
+                parsed[d] = _parse_date(d)
+            nurse_order.setdefault(nurse, None)
+            cells.append((nurse, parsed[d], shift_code(shift), d))
+
+        all_dates = set(parsed.values())
+        if start is not None and end is not None:
+            start, end = _parse_date(start), _parse_date(end)
+            all_dates.update(start + timedelta(days=i) for i in range((end - start).days + 1))
+
+        roster = cls(nurse_order, sorted(all_dates))
+        date_pos = {d: j for j, d in enumerate(roster.dates)}
+        for nurse, d, code, raw in cells:
+            i, j = roster._nurse_pos[nurse], date_pos[d]
+            if roster.shifts[i, j]:
+                raise ValueError(f"Multiple shifts for {nurse} on {raw}")
+            roster.shifts[i, j] = code
+        return roster
+
+    @classmethod
+    def coerce(cls, schedule, nurses: Iterable[str] = None, start=None, end=None) -> "Roster":
+        """Returns `schedule` unchanged if it is already a Roster, else parses the wire format."""
+        if isinstance(schedule, cls):
+            return schedule
+        return cls.from_wire(schedule, nurses, start, end)
+
+    # --- Views (no copies) ---
+
+    def nurse_index(self, nurse: str) -> int:
+        return self._nurse_pos[nurse]
+
+    def date_index(self, d) -> int:
+        return self._date_pos[d if isinstance(d, str) else d.isoformat()]
+
+    def nurse_row(self, nurse: str) -> np.ndarray:
+        """Shift codes for one nurse across all dates (a view)."""
+        return self.shifts[self._nurse_pos[nurse]]
+
+    def day_column(self, d) -> np.ndarray:
+        """Shift codes for all nurses on one date (a view)."""
+        return self.shifts[:, self.date_index(d)]
+
+    def get(self, nurse: str, d) -> Optional[str]:
+        return SHIFTS[self.shifts[self._nurse_pos[nurse], self.date_index(d)]]
+
+    def week_index(self, start=None) -> np.ndarray:
+        """0-based 7-day block of each date column, counted from `start` (default: first date)."""
+        start = _parse_date(start) if start is not None else (self.dates[0] if self.dates else None)
+        return np.array([(d - start).days // 7 for d in self.dates], dtype=np.int32)
+
+    def hours(self) -> np.ndarray:
+        """Worked hours per cell (nurse x date)."""
+        return SHIFT_HOURS[self.shifts]
+
+    def letters(self, nurse: str) -> str:
+        """One letter per date for a nurse, see LETTERS."""
+        return _LETTER_BYTES[self.nurse_row(nurse)].tobytes().decode("ascii")
+
+    # --- Back to the wire format ---
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.shifts))
+
+    def __iter__(self):
+        """Yields (nurse, iso_date, shift) for every assigned cell, nurse-major."""
+        rows, cols = np.nonzero(self.shifts)
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            yield self.nurses[i], self.iso_dates[j], SHIFTS[self.shifts[i, j]]
+
+    def to_triples(self) -> list:
+        return [[n, d, s] for n, d, s in self]
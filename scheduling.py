@@ -0,0 +1,130 @@
+"""
+Framework-independent pieces of the /schedule relaxation ladder, shared by
+the Flask app (app.py) and the ASGI app (asgi_app.py). Responses are
+returned as (body, status) pairs.
+"""
+import time
+import logging
+from datetime import datetime
+
+from prompts import build_prompt
+from llm_client import provider_health, ProviderUnavailable
+from validator import validate_schedule
+from warm_start import previous_tail
+from roster import Roster
+from feasibility import (
+    check_feasibility, first_viable_stage, SOFT_RULES, SHIFT_PREF, AM_PCT, WEEKLY_HOURS
+)
+
+# === Soft Constraint Relaxation Stages ===
+RELAXATIONS = [
+    {"note": "Strict (no relaxation)", "append": "", "relaxes": frozenset()},
+    {"note": "Ignore shift preferences", "append": "\nYou may ignore nurse shift preferences if needed.",
+     "relaxes": frozenset({SHIFT_PREF})},
+    {"note": "Relax AM shift % if needed", "append": "\nYou may relax AM shift % if needed.",
+     "relaxes": frozenset({AM_PCT})},
+    {"note": "Relax weekly hour targets", "append": "\nYou may relax weekly target hours if needed.",
+     "relaxes": frozenset({WEEKLY_HOURS})},
+    {"note": "Relax any 2 soft rules", "append": "\nYou may relax any 2 soft rules above.",
+     "relaxes": SOFT_RULES, "max_relaxed": 2},
+    {"note": "Relax all soft rules", "append": "\nYou may relax all soft rules if necessary.",
+     "relaxes": SOFT_RULES},
+]
+
+
+def prepare_request(user_inputs: dict, store):
+    """
+    Normalises dates, resolves the warm-start tail and runs the pre-flight
+    feasibility check (mutates user_inputs).
+    Returns (first_stage, None) to proceed, or (None, (body, status)) to reply now.
+    """
+    if not user_inputs:
+        return None, ({"error": "Invalid or missing JSON payload"}, 400)
+
+    try:
+        # parse whatever was sent (e.g. “2025-6-26”), then re-serialize correctly
+        sd = datetime.fromisoformat(user_inputs["start_date"]).date()
+        ed = datetime.fromisoformat(user_inputs["end_date"]).date()
+        user_inputs["start_date"] = sd.isoformat()
+        user_inputs["end_date"]   = ed.isoformat()
+    except Exception as e:
+        return None, ({"error": f"Invalid date format: {e}"}, 400)
+
+    # Warm start: use the supplied previous roster, else the stored one if a ward was sent
+    names = [n["name"] for n in user_inputs.get("nurses", [])]
+    if not user_inputs.get("previous_schedule") and user_inputs.get("ward"):
+        user_inputs["previous_schedule"] = store.previous_schedule(user_inputs["ward"], user_inputs["start_date"], names)
+    if user_inputs.get("previous_schedule"):
+        try:
+            user_inputs["previous_schedule"] = previous_tail(user_inputs["previous_schedule"], sd, set(names))
+        except (ValueError, TypeError, KeyError) as e:
+            return None, ({"error": f"Invalid previous_schedule: {e}"}, 400)
+
+    # === Pre-flight feasibility: no LLM call for inputs that cannot satisfy the HARD rules ===
+    report = check_feasibility(user_inputs)
+    if not report["feasible"]:
+        logging.info(f"[FEASIBILITY] Infeasible input: {len(report['bottlenecks'])} bottleneck(s)")
+        return None, ({
+            "error": "Infeasible input: not enough available nurses to meet minimum staffing",
+            "bottlenecks": report["bottlenecks"],
+            "relaxed_constraints": "None (pre-flight check)"
+        }, 422)
+    first_stage = first_viable_stage(RELAXATIONS, report["must_relax"])
+    if first_stage:
+        logging.info(f"[FEASIBILITY] Must relax {report['must_relax']}; starting at stage {first_stage}")
+    return first_stage, None
+
+
+def stage_prompt(user_inputs: dict, stage: dict) -> str:
+    """Build prompt with current relaxation"""
+    logging.info(f"\n=== Attempt: {stage['note']} ===")
+    return build_prompt(user_inputs) + stage["append"]
+
+
+def accept_schedule(schedule: list, stage: dict, user_inputs: dict, store, start_time: float):
+    """Validates and stores a generated schedule. Raises ValueError if a hard rule is violated."""
+    # Parse once; validator and store share the same Roster
+    roster = Roster.from_wire(schedule, [n["name"] for n in user_inputs["nurses"]])
+
+    # Try validating the schedule
+    validate_schedule(roster, user_inputs)
+
+    elapsed = time.time() - start_time
+    logging.info(f"[TIMING] Solution found in {elapsed:.2f} seconds.")
+
+    # Only rosters for a named ward are stored; unnamed requests would mix unrelated teams
+    roster_id = None
+    if user_inputs.get("ward"):
+        try:
+            roster_id = store.save_roster(
+                user_inputs["ward"], user_inputs["start_date"], user_inputs["end_date"], roster, stage["note"]
+            )
+        except Exception as e:
+            logging.error(f"[STORE ERROR] {e}")
+
+    # If valid, return result with relaxation info
+    return {
+        "schedule": schedule,
+        "roster_id": roster_id,
+        "relaxed_constraints": stage["note"],
+        "solve_time_seconds": round(elapsed, 2)
+    }, 200
+
+
+def provider_error(rte: RuntimeError):
+    """Maps rate limiting / unavailable providers to (body, status); None for other errors."""
+    if "rate limit" in str(rte).lower():
+        return {"error": str(rte)}, 429
+    if isinstance(rte, ProviderUnavailable):
+        return {
+            "error": str(rte),
+            "providers": provider_health()["providers"]
+        }, 503
+    return None
+
+
+def all_failed(last_error: str):
+    return {
+        "error": f"All attempts failed. Last validation error: {last_error}",
+        "relaxed_constraints": "All soft constraints attempted"
+    }, 422
@@ -0,0 +1,165 @@
+import sqlite3
+import logging
+from contextlib import closing
+from datetime import datetime, timedelta
+
+from roster import Roster, LETTERS, SHIFTS, SHIFT_HOURS, SHIFT_CODES, shift_code
+from warm_start import TAIL_DAYS
+
+# Shifts are stored as the roster's one-letter codes
+SHIFT_LETTERS = {SHIFTS[code]: LETTERS[code] for code in SHIFT_CODES.values()}
+LETTER_SHIFTS = {letter: shift for shift, letter in SHIFT_LETTERS.items()}
+LETTER_HOURS = {LETTERS[code]: int(SHIFT_HOURS[code]) for code in SHIFT_CODES.values()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rosters (
+    id INTEGER PRIMARY KEY,
+    ward TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    relaxed_constraints TEXT,
+    created_at TEXT NOT NULL
+);
+
+-- Latest assignment per (ward, date, nurse), indexed for calendar/coverage queries
+CREATE TABLE IF NOT EXISTS assignments (
+    ward TEXT NOT NULL,
+    date TEXT NOT NULL,
+    nurse TEXT NOT NULL,
+    shift TEXT NOT NULL,
+    roster_id INTEGER NOT NULL,
+    PRIMARY KEY (ward, date, nurse)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_assignments_ward_date_shift ON assignments (ward, date, shift);
+CREATE INDEX IF NOT EXISTS idx_assignments_nurse_date ON assignments (nurse, date);
+-- Cross-ward "who is on Night on D" lookups
+CREATE INDEX IF NOT EXISTS idx_assignments_date_shift ON assignments (date, shift);
+"""
+
+
+def _iso(d) -> str:
+    """Normalises a date or date string to YYYY-MM-DD (raises ValueError)."""
+    if isinstance(d, str):
+        return datetime.fromisoformat(d).date().isoformat()
+    return d.isoformat()
+
+
+class RosterStore:
+    """SQLite-backed store of generated rosters."""
+
+    def __init__(self, path: str = "rosters.db"):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps the store safe across request threads
+        return sqlite3.connect(self.path, timeout=10)
+
+    def save_roster(self, ward: str, start_date: str, end_date: str, schedule,
+                    relaxed_constraints: str = None) -> int:
+        """
+        Persists a validated schedule (Roster or wire format) and returns its roster id.
+        It supersedes every stored assignment of `ward` between start_date and end_date.
+        """
+        roster = Roster.coerce(schedule)
+        start = datetime.fromisoformat(start_date).date()
+        end = datetime.fromisoformat(end_date).date()
+        period = Roster.empty(roster.nurses, start, end)
+        cols = [j for j, d in enumerate(roster.dates) if start <= d <= end]
+        period.shifts[:, [period.date_index(roster.dates[j]) for j in cols]] = roster.shifts[:, cols]
+
+        cells = [(ward, d, nurse, SHIFT_LETTERS[shift]) for nurse, d, shift in period]
+
+        with closing(self._connect()) as conn, conn:
+            cur = conn.execute(
+                "INSERT INTO rosters (ward, start_date, end_date, relaxed_constraints, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (ward, start_date, end_date, relaxed_constraints, datetime.now().isoformat(timespec="seconds"))
+            )
+            roster_id = cur.lastrowid
+            conn.execute(
+                "DELETE FROM assignments WHERE ward = ? AND date BETWEEN ? AND ?",
+                (ward, start.isoformat(), end.isoformat())
+            )
+            conn.executemany(
+                "INSERT INTO assignments (ward, date, nurse, shift, roster_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [cell + (roster_id,) for cell in cells]
+            )
+        logging.info(f"[STORE] Saved roster {roster_id} for {ward} {start_date}..{end_date} ({len(cells)} cells)")
+        return roster_id
+
+    def nurse_calendar(self, nurse: str, start: str, end: str, ward: str = None) -> list:
+        """Returns a nurse's assignments between start and end inclusive."""
+        sql = "SELECT date, ward, shift FROM assignments WHERE nurse = ? AND date BETWEEN ? AND ?"
+        params = [nurse, _iso(start), _iso(end)]
+        if ward:
+            sql += " AND ward = ?"
+            params.append(ward)
+        sql += " ORDER BY date, ward"
+        with closing(self._connect()) as conn:
+            return [
+                {"date": d, "ward": w, "shift": LETTER_SHIFTS.get(s, s)}
+                for d, w, s in conn.execute(sql, params)
+            ]
+
+    def day_coverage(self, date: str, ward: str = None, shift: str = None) -> dict:
+        """Returns {ward: {shift: [nurses]}} for one date (raises ValueError on an unknown shift)."""
+        sql = "SELECT ward, shift, nurse FROM assignments WHERE date = ?"
+        params = [_iso(date)]
+        if ward:
+            sql += " AND ward = ?"
+            params.append(ward)
+        if shift:
+            sql += " AND shift = ?"
+            params.append(LETTERS[shift_code(shift)])
+        sql += " ORDER BY ward, shift, nurse"
+
+        coverage = {}
+        with closing(self._connect()) as conn:
+            for w, s, nurse in conn.execute(sql, params):
+                coverage.setdefault(w, {}).setdefault(LETTER_SHIFTS.get(s, s), []).append(nurse)
+        return coverage
+
+    def weekly_hours(self, nurse: str, start: str, end: str, ward: str = None) -> list:
+        """Returns worked hours per 7-day block counted from start (same blocks as the rules)."""
+        start_d = datetime.fromisoformat(_iso(start)).date()
+        end_d = datetime.fromisoformat(_iso(end)).date()
+        num_weeks = (end_d - start_d).days // 7 + 1
+        weeks = [
+            {
+                "week": w + 1,
+                "week_start": (start_d + timedelta(days=7 * w)).isoformat(),
+                "hours": 0,
+                "shifts": 0,
+            }
+            for w in range(num_weeks)
+        ]
+        for entry in self.nurse_calendar(nurse, start, end, ward):
+            w = (datetime.fromisoformat(entry["date"]).date() - start_d).days // 7
+            hours = LETTER_HOURS[SHIFT_LETTERS[entry["shift"]]]
+            weeks[w]["hours"] += hours
+            if hours:
+                weeks[w]["shifts"] += 1
+        return weeks
+
+    def previous_schedule(self, ward: str, start_date: str, nurses: list = None,
+                          days: int = TAIL_DAYS) -> list:
+        """Returns [nurse, date, shift] triples for the `days` days before start_date (only `nurses` if given)."""
+        start = datetime.fromisoformat(start_date).date()
+        first = (start - timedelta(days=days)).isoformat()
+        last = (start - timedelta(days=1)).isoformat()
+        keep = set(nurses) if nurses is not None else None
+        with closing(self._connect()) as conn:
+            return [
+                [nurse, d, LETTER_SHIFTS.get(s, s)]
+                for d, nurse, s in conn.execute(
+                    "SELECT date, nurse, shift FROM assignments "
+                    "WHERE ward = ? AND date BETWEEN ? AND ? ORDER BY date, nurse",
+                    (ward, first, last)
+                )
+                if keep is None or nurse in keep
+            ]
@@ -5,6 +5,7 @@ import os
 import pandas as pd
 from utils.button import excel_download_button
 from utils.tables import make_schedule_table, nurse_summary_table
+from roster import Roster
 
 # If you want to call your Flask service:
 FLASK_URL = os.getenv("FLASK_URL", "http://localhost:5000/schedule")
@@ -33,7 +34,15 @@ num_juniors = st.number_input("Number of Junior Nurses", min_value=0, value=10,
 st.markdown("### Default Preferences")
 st.info("All nurses default to no specific shift preference and no MC days.")
 
-# 5. On-click: call the API
+# 5. Warm start from the last generated roster
+use_previous = st.checkbox(
+    "Continue from last generated roster",
+    value=False,
+    disabled="last_schedule" not in st.session_state,
+    help="Sends the previous roster so cross-period rules (weekend rotation, Night→AM, REST streaks) carry over."
+)
+
+# 6. On-click: call the API
 if st.button("Generate Schedule"):
     # Generate nurse list programmatically
     nurses = []
@@ -62,6 +71,8 @@ if st.button("Generate Schedule"):
         "pref_weight": pref_weight,
         "nurses": nurses,
     }
+    if use_previous and "last_schedule" in st.session_state:
+        payload["previous_schedule"] = st.session_state["last_schedule"]
     with st.spinner("Calling scheduler…"):
         try:
             resp = requests.post(FLASK_URL, json=payload)
@@ -73,23 +84,20 @@ if st.button("Generate Schedule"):
             if data.get("error"):
                 st.error(data["error"])
             else:
-                # 6. Display schedule
+                # 7. Display schedule
                 schedule = data["schedule"]
                 if not schedule:
                     st.error("No schedule returned.")
                     st.stop()
-                
-                 # --- FIX: convert if needed ---
-                if schedule and isinstance(schedule[0], list):
-                    schedule = [
-                        {"nurse": n, "date": d, "shift": s}
-                        for n, d, s in schedule
-                    ]
+                st.session_state["last_schedule"] = schedule
+
+                # Parse the wire format once for both tables
+                roster = Roster.from_wire(schedule, [n["name"] for n in nurses])
                 st.success("✅ Schedule generated!")
-                pivot = make_schedule_table(schedule, nurses)
+                pivot = make_schedule_table(roster, nurses)
                 st.dataframe(pivot.fillna(""))
 
-                summary_df = nurse_summary_table(schedule, nurses)
+                summary_df = nurse_summary_table(roster, nurses)
                 st.markdown("### Nurse Assignment Summary")
                 st.dataframe(summary_df)
 
@@ -1,76 +1,82 @@
+import numpy as np
 import pandas as pd
 
-def make_schedule_table(schedule, nurses):
-    df = pd.DataFrame(schedule)
-    pivot = df.pivot(index="nurse", columns="date", values="shift")
+from roster import Roster, SHIFTS, SHIFT_NAMES, AM, PM, NIGHT, REST, MC, UNASSIGNED
+
+def _nurse_order(nurses):
     # Sort nurses: seniors first, then juniors
     senior_names = [n["name"] for n in nurses if n["senior"]]
     junior_names = [n["name"] for n in nurses if not n["senior"]]
-    nurse_order = senior_names + junior_names
-    pivot = pivot.reindex(nurse_order)
-    pivot = pivot.reindex(sorted(pivot.columns), axis=1)
+    return senior_names + junior_names
+
+
+def make_schedule_table(schedule, nurses):
+    nurse_order = _nurse_order(nurses)
+    roster = Roster.coerce(schedule, nurse_order)
+    rows = [roster.nurse_index(n) for n in nurse_order]
+    pivot = pd.DataFrame(
+        SHIFT_NAMES[roster.shifts[rows]],
+        index=pd.Index(nurse_order, name="nurse"),
+        columns=pd.Index(roster.iso_dates, name="date"),
+    )
     return pivot
 
 
 def nurse_summary_table(schedule, nurses):
+    roster = Roster.coerce(schedule, [n["name"] for n in nurses])
+
     # Build lookup for preferences and MC days (just count for MC)
     nurse_prefs = {n["name"]: n.get("shift_pref", "none") for n in nurses}
-    nurse_mc_count = {n["name"]: len(n.get("mc_days", [])) for n in nurses}
 
     # Determine total days and number of complete weeks
-    all_dates = sorted({e["date"] for e in schedule})
-    num_days = len(all_dates)
+    num_days = len(roster.dates)
     num_complete_weeks = num_days // 7
+    hours = roster.hours().astype(np.int32)
 
     # Prepare summary rows
     summary = []
-    for nurse in nurse_prefs:
-        entries = [e for e in schedule if e["nurse"] == nurse]
-        counts = {"AM": 0, "PM": 0, "Night": 0, "REST": 0, "MC": 0}
-        met, unmet, unmet_details = 0, 0, []
-        pref = nurse_prefs[nurse]
+    for nurse, pref in nurse_prefs.items():
+        i = roster.nurse_index(nurse)
+        row = roster.shifts[i]
+        counts = np.bincount(row, minlength=len(SHIFTS))
 
-        # Build DataFrame for this nurse's entries
-        df = pd.DataFrame(entries)
+        # Hours per complete week (blank if the nurse is missing a day in it)
         week_hours = {}
-        if not df.empty:
-            df = df.sort_values("date")
-            df["date"] = pd.to_datetime(df["date"])
-            # Assign week number (1-based)
-            df["week"] = ((df["date"] - df["date"].min()).dt.days // 7) + 1
-            shift_hours = {"AM": 7, "PM": 7, "Night": 10, "REST": 0, "MC": 0}
-            df["hours"] = df["shift"].map(shift_hours)
+        if counts[UNASSIGNED] < num_days:
+            # Assign week number relative to this nurse's first day
+            weeks = roster.week_index(roster.dates[int(np.argmax(row != UNASSIGNED))])
             for w in range(1, num_complete_weeks + 1):
-                week_df = df[df["week"] == w]
-                if len(week_df) == 7:
-                    week_hours[w] = week_df["hours"].sum()
+                cols = weeks == w - 1
+                if np.count_nonzero(row[cols]) == 7:
+                    week_hours[w] = int(hours[i, cols].sum())
                 else:
                     week_hours[w] = ""
-        # Count shifts and preferences
-        for e in entries:
-            shift = e["shift"]
-            counts[shift] = counts.get(shift, 0) + 1
+
+        # Count preferences
+        met, unmet, unmet_details = 0, 0, []
+        for j in np.nonzero(row)[0]:
+            shift = SHIFTS[row[j]]
             if shift == pref:
                 met += 1
-            elif shift not in ("REST", "MC") and pref != "none":
+            elif row[j] not in (REST, MC) and pref != "none":
                 unmet += 1
-                unmet_details.append(f"{e['date']}→{shift}")
-        row = {
+                unmet_details.append(f"{roster.iso_dates[j]}→{shift}")
+        row_out = {
             "Nurse": nurse,
-            "MC": counts["MC"],
-            "AM": counts["AM"],
-            "PM": counts["PM"],
-            "Night": counts["Night"],
-            "REST": counts["REST"],
+            "MC": int(counts[MC]),
+            "AM": int(counts[AM]),
+            "PM": int(counts[PM]),
+            "Night": int(counts[NIGHT]),
+            "REST": int(counts[REST]),
         }
         # Insert week columns here (between REST and Pref met)
         for w in range(1, num_complete_weeks + 1):
-            row[f"Week {w} hours"] = week_hours.get(w, "")
+            row_out[f"Week {w} hours"] = week_hours.get(w, "")
         # Continue with the rest of the columns
-        row.update({
+        row_out.update({
             "Pref met": met,
             "Pref unmet": unmet,
             "Unmet details": "; ".join(unmet_details)
         })
-        summary.append(row)
-    return pd.DataFrame(summary)
\ No newline at end of file
+        summary.append(row_out)
+    return pd.DataFrame(summary)
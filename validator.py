@@ -1,128 +1,119 @@
 # validator.py
 from datetime import datetime, timedelta
-from collections import defaultdict
 import logging
 
-def validate_schedule(schedule: list, user_inputs: dict) -> None:
+import numpy as np
+
+from roster import Roster, SHIFTS, AM, NIGHT, REST, MC, WORKING
+
+def validate_schedule(schedule, user_inputs: dict) -> None:
     """
     Raises ValueError if any hard rule is violated.
+    `schedule` may be a Roster or the JSON wire format (triples or dicts).
     """
-    # If schedule is a list of lists, convert to dicts for compatibility
-    if schedule and isinstance(schedule[0], list):
-        schedule = [
-            {"nurse": n, "date": d, "shift": s}
-            for n, d, s in schedule
-        ]
-    # Map nurse->list of (date, shift)
-    assignments = {}
-    # Track weekly hours per nurse
-    hours_per_week = {}
-    # Define **working** shift hours
-    SHIFT_HOURS = {"AM": 7, "PM": 7, "Night": 10}
-
+    nurses = user_inputs.get("nurses", [])
     schedule_start = datetime.fromisoformat(user_inputs["start_date"]).date()
     schedule_end = datetime.fromisoformat(user_inputs["end_date"]).date()
 
-    # Helper to parse date
-    def parse(d: str) -> datetime:
-        try:
-            return datetime.fromisoformat(d)
-        except Exception:
-            raise ValueError(f"Invalid date in schedule: {d}")
+    # Parses dates once and rejects duplicate (nurse, date) cells
+    roster = Roster.coerce(schedule, [n["name"] for n in nurses])
+    shifts = roster.shifts
+    assigned = shifts != 0
+    working = np.isin(shifts, WORKING)
 
-    # Build assignments and schedule_by_nurse
-    schedule_by_nurse = defaultdict(list)
-    for entry in schedule:
-        nurse = entry["nurse"]
-        date = entry["date"]
-        shift = entry["shift"]
-        dt = parse(date)
-        # MC day check
-        for n in user_inputs.get("nurses", []):
-            if n["name"] == nurse and date in n.get("mc_days", []):
-                if shift != "MC":
-                    raise ValueError(f"Scheduled on MC day: {nurse} on {date}")
-        # One shift per day
-        key = (nurse, date)
-        if key in assignments:
-            raise ValueError(f"Multiple shifts for {nurse} on {date}")
-        assignments[key] = shift
-        # Hours tally
-        week_num = ((dt.date() - schedule_start).days // 7) + 1
-        week_key = (nurse, week_num)
-        hours_per_week[week_key] = hours_per_week.get(week_key, 0) + SHIFT_HOURS.get(shift, 0)
-        # Build schedule_by_nurse for REST check
-        schedule_by_nurse[nurse].append(shift.upper())
+    # MC day check
+    for n in nurses:
+        if n["name"] not in roster.nurses:
+            continue
+        row = roster.nurse_row(n["name"])
+        for date in n.get("mc_days", []):
+            if date in roster.iso_dates:
+                code = row[roster.date_index(date)]
+                if code and code != MC:
+                    raise ValueError(f"Scheduled on MC day: {n['name']} on {date}")
 
     # Weekly hour cap (only for full weeks)
-    for (nurse, week), hrs in hours_per_week.items():
-        # Count number of days scheduled for this nurse in this week
-        days_in_week = sum(
-            1 for entry in schedule
-            if entry["nurse"] == nurse and
-               ((parse(entry["date"]).date() - schedule_start).days // 7) + 1 == week
-        )
-        if days_in_week == 7:
-            if hrs >= 48:
-                logging.warning(f"{nurse} exceeds 42h in full week of {week}: {hrs}h")
+    weeks = roster.week_index(schedule_start)
+    hours = roster.hours().astype(np.int32)
+    for week in np.unique(weeks):
+        cols = weeks == week
+        week_hours = hours[:, cols].sum(axis=1)
+        days_in_week = assigned[:, cols].sum(axis=1)
+        for i in np.nonzero((days_in_week == 7) & (week_hours >= 48))[0]:
+            logging.warning(f"{roster.nurses[i]} exceeds 42h in full week of {week + 1}: {week_hours[i]}h")
 
     # Coverage per day/shift
-    cover = defaultdict(list)  # (date, shift) -> [nurse,...]
-    seniors = set(n["name"] for n in user_inputs.get("nurses", []) if n.get("senior"))
-    for (nurse, date), shift in assignments.items():
-        if shift in SHIFT_HOURS:
-            cover[(date, shift)].append(nurse)
-    for (date, shift), nurses in cover.items():
-        if len(nurses) < 4:
-            logging.warning(f"Understaffed {shift} on {date}: {len(nurses)} nurses")
-        if not any(n in seniors for n in nurses):
-            logging.warning(f"No senior on {shift} {date}")
+    seniors = set(n["name"] for n in nurses if n.get("senior"))
+    senior_rows = np.array([n in seniors for n in roster.nurses], dtype=bool)
+    for date in roster.iso_dates:
+        column = roster.day_column(date)
+        for code in WORKING:
+            on_shift = column == code
+            count = int(on_shift.sum())
+            if not count:
+                continue
+            shift = SHIFTS[code]
+            if count < 4:
+                logging.warning(f"Understaffed {shift} on {date}: {count} nurses")
+            if not (on_shift & senior_rows).any():
+                logging.warning(f"No senior on {shift} {date}")
 
     # Weekend rest rule
-    for (nurse, date), shift in assignments.items():
-        dt = parse(date)
-        if dt.weekday() >= 5:
-            next_week = dt + timedelta(days=7)
-            rest_key = (nurse, next_week.date())
-            if rest_key in assignments:
-                logging.warning(f"Weekend rest violation: {nurse} works {date} and {next_week.date()}")
+    date_cols = {d: j for j, d in enumerate(roster.dates)}
+    for j, d in enumerate(roster.dates):
+        if d.weekday() < 5:
+            continue
+        k = date_cols.get(d + timedelta(days=7))
+        if k is None:
+            continue
+        for i in np.nonzero(working[:, j] & working[:, k])[0]:
+            logging.warning(f"Weekend rest violation: {roster.nurses[i]} works {roster.iso_dates[j]} and {roster.iso_dates[k]}")
 
     # No nurse may be assigned REST for all days
-    num_days = (datetime.fromisoformat(user_inputs["end_date"]).date() -
-                datetime.fromisoformat(user_inputs["start_date"]).date()).days + 1
-    for nurse, shifts in schedule_by_nurse.items():
-        if all(s == "REST" for s in shifts):
-            logging.warning(f"Nurse {nurse} has REST for all {num_days} days")
-        
+    num_days = (schedule_end - schedule_start).days + 1
+    for i in np.nonzero(assigned.any(axis=1) & ((shifts == REST) | ~assigned).all(axis=1))[0]:
+        logging.warning(f"Nurse {roster.nurses[i]} has REST for all {num_days} days")
+
+    # Streak rules run on one contiguous calendar of the previous period tail
+    # (warm start) followed by this period; an unassigned day breaks a streak.
+    previous = Roster.coerce(user_inputs.get("previous_schedule") or [])
+    tail_cols = [j for j, d in enumerate(previous.dates) if d < schedule_start]
+    calendar = Roster.empty(
+        roster.nurses,
+        min([previous.dates[j] for j in tail_cols] + roster.dates + [schedule_start]),
+        max(roster.dates + [schedule_end]),
+    )
+    calendar.shifts[:, [calendar.date_index(d) for d in roster.dates]] = shifts
+    tail_pos = [calendar.date_index(previous.dates[j]) for j in tail_cols]
+    for nurse in previous.nurses:
+        if nurse in roster.nurses:
+            calendar.shifts[calendar.nurse_index(nurse), tail_pos] = previous.nurse_row(nurse)[tail_cols]
+    first_day = calendar.date_index(schedule_start)
 
-    # After building schedule_by_nurse and hours_per_week
-    for nurse, shifts in schedule_by_nurse.items():
-        # Check for >2 consecutive REST days
+    for i, nurse in enumerate(calendar.nurses):
+        row = calendar.shifts[i]
+
+        # Check for >2 consecutive REST days (ending in this period)
         rest_streak = 0
-        for s in shifts:
-            if s == "REST":
+        for j, s in enumerate(row.tolist()):
+            if s == REST:
                 rest_streak += 1
-                if rest_streak > 2:
+                if rest_streak > 2 and j >= first_day:
                     logging.warning(f"{nurse} has more than 2 consecutive REST days")
             else:
                 rest_streak = 0
 
-    # At least 1 REST per week
-    for (nurse, week), hrs in hours_per_week.items():
-        # Find all shifts for this nurse/week
-        week_shifts = [
-            entry["shift"].upper()
-            for entry in schedule
-            if entry["nurse"] == nurse and
-            ((parse(entry["date"]).date() - schedule_start).days // 7) + 1 == week
-        ]
-        if "REST" not in week_shifts:
-            logging.warning(f"{nurse} has no REST day in week of {week}")
-        
+        # Night → AM (including Night on the last previous day)
+        for k in np.nonzero((row[:-1] == NIGHT) & (row[1:] == AM))[0] + 1:
+            if k == first_day:
+                logging.warning(f"{nurse} has Night on the previous day followed by AM on day 1")
+            elif k > first_day:
+                logging.warning(f"{nurse} has Night followed by AM on day {k - first_day + 1}")
 
-    # For each nurse, check Night → AM
-    for nurse, shifts in schedule_by_nurse.items():
-        for i in range(len(shifts) - 1):
-            if shifts[i] == "NIGHT" and shifts[i + 1] == "AM":
-                logging.warning(f"{nurse} has Night followed by AM on day {i+2}")
-                
\ No newline at end of file
+    # At least 1 REST per week
+    for week in np.unique(weeks):
+        cols = weeks == week
+        has_days = assigned[:, cols].any(axis=1)
+        has_rest = (shifts[:, cols] == REST).any(axis=1)
+        for i in np.nonzero(has_days & ~has_rest)[0]:
+            logging.warning(f"{roster.nurses[i]} has no REST day in week of {week + 1}")
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from roster import Roster, NIGHT, REST, WORKING
+
+# Days of the previous period carried over. Seven covers every cross-period
+# rule (weekend rotation looks back exactly one week).
+TAIL_DAYS = 7
+
+
+def previous_tail(previous, start_date, nurses=None, days: int = TAIL_DAYS) -> list:
+    """
+    Keeps only the last `days` days before start_date from a previous roster,
+    and only the rows of `nurses` if given. Raises ValueError on malformed entries.
+    """
+    if isinstance(start_date, str):
+        start_date = datetime.fromisoformat(start_date).date()
+    first = start_date - timedelta(days=days)
+
+    roster = Roster.coerce(previous)
+    cols = [j for j, d in enumerate(roster.dates) if first <= d < start_date]
+    rows = [i for i, n in enumerate(roster.nurses) if nurses is None or n in nurses]
+    tail = Roster([roster.nurses[i] for i in rows], [roster.dates[j] for j in cols], roster.shifts[np.ix_(rows, cols)])
+    return sorted(tail.to_triples(), key=lambda e: (e[1], e[0]))
+
+
+def boundary_constraints(tail: Roster, start_date: str) -> list:
+    """Derives the cross-period HARD/soft rules that the previous tail imposes."""
+    start = datetime.fromisoformat(start_date).date()
+    day_before = (start - timedelta(days=1)).isoformat()
+    worked = np.isin(tail.shifts, WORKING)
+
+    rules = []
+
+    # Rule 6: Night on the last previous day -> no AM on day 1
+    if day_before in tail.iso_dates:
+        column = tail.day_column(day_before)
+        night_before = sorted(tail.nurses[i] for i in np.nonzero(column == NIGHT)[0])
+        if night_before:
+            rules.append(f"- Night on {day_before}, so NO AM on {start_date}: {', '.join(night_before)}")
+
+    # Rule 5: REST streaks continue across the boundary. Only days up to the day
+    # before count, and an unassigned (unknown) day ends the streak.
+    must_work, one_rest_left = [], []
+    last = tail.date_index(day_before) + 1 if day_before in tail.iso_dates else 0
+    for i, nurse in enumerate(tail.nurses):
+        streak = 0
+        for s in reversed(tail.shifts[i, :last].tolist()):
+            if s != REST:
+                break
+            streak += 1
+        if streak >= 2:
+            must_work.append(nurse)
+        elif streak == 1:
+            one_rest_left.append(nurse)
+    if must_work:
+        rules.append(f"- Ended on 2 REST days, so MUST work on {start_date}: {', '.join(sorted(must_work))}")
+    if one_rest_left:
+        rules.append(f"- Ended on 1 REST day, so at most 1 more REST from {start_date}: {', '.join(sorted(one_rest_left))}")
+
+    # Rule 9: weekend rotation into the first week block
+    for offset in range(7):
+        d = start + timedelta(days=offset)
+        if d.weekday() < 5:
+            continue
+        prev = (d - timedelta(days=7)).isoformat()
+        if prev not in tail.iso_dates:
+            continue
+        nurses = sorted(tail.nurses[i] for i in np.nonzero(worked[:, tail.date_index(prev)])[0])
+        if nurses:
+            rules.append(f"- Worked {d.strftime('%A')} {prev}, so REST on {d.isoformat()}: {', '.join(nurses)}")
+
+    return rules
+
+
+def build_previous_block(tail, start_date: str) -> str:
+    """Formats the previous period's tail as a compact prompt section ("" if none)."""
+    if not tail:
+        return ""
+
+    # Cover the whole tail window, so days missing from the tail show as "-"
+    start = datetime.fromisoformat(start_date).date()
+    tail = Roster.from_wire(tail, start=start - timedelta(days=TAIL_DAYS), end=start - timedelta(days=1))
+    rows = "\n  ".join(f"{nurse}: {tail.letters(nurse)}" for nurse in sorted(tail.nurses))
+    rules = boundary_constraints(tail, start_date)
+    rules_block = "\n  ".join(rules) if rules else "None"
+
+    return f"""
+PREVIOUS PERIOD (WARM START):
+- Tail {tail.iso_dates[0]} to {tail.iso_dates[-1]}, one letter per day (A=AM, P=PM, N=Night, R=REST, M=MC, -=none):
+  {rows}
+- Boundary rules carried into this period (same priority as the numbered rule they extend):
+  {rules_block}
+- Continue each nurse's rotation from the tail where it satisfies all rules.
+"""